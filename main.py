@@ -1,41 +1,208 @@
 import os
+import asyncio
+import functools
+import hmac
 import secrets
 import hashlib
-from datetime import datetime, timezone
-from typing import List, Optional, Dict, Any
-
-from fastapi import FastAPI, HTTPException, Header
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime, timedelta, timezone
+from types import MappingProxyType
+from typing import List, Mapping, Optional, Dict, Any, Tuple
+
+from argon2 import PasswordHasher
+from argon2.exceptions import InvalidHashError, VerificationError
+from bson import Binary, ObjectId
+from cachetools import TTLCache
+from fastapi import Depends, FastAPI, HTTPException, Header, Query
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel, EmailStr, Field
+from fastapi.responses import ORJSONResponse
+import orjson
+from pydantic import BaseModel, ConfigDict, EmailStr, Field, TypeAdapter
+from pymongo.errors import ConnectionFailure, DuplicateKeyError, OperationFailure, PyMongoError
 
 from database import db, create_document, get_documents
 
-app = FastAPI(title="Travel Planner API")
+logger = logging.getLogger(__name__)
+
+
+def _json_default(obj: Any) -> str:
+    if isinstance(obj, ObjectId):
+        return str(obj)
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+
+class MongoJSONResponse(ORJSONResponse):
+    # orjson encodes datetimes natively; only ObjectId needs a fallback.
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, default=_json_default)
+
+
+app = FastAPI(title="Travel Planner API", default_response_class=MongoJSONResponse)
+
+# Comma-separated list, e.g. "https://app.example.com,https://admin.example.com".
+# Unset falls back to "*", which is only valid here because credentials
+# (cookies) are not used; auth travels in the Authorization header.
+_ALLOWED_ORIGINS = tuple(o.strip() for o in os.getenv("ALLOWED_ORIGINS", "").split(",") if o.strip()) or ("*",)
 
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=["*"],
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
+    allow_origins=_ALLOWED_ORIGINS,
+    allow_methods=("GET", "POST"),
+    allow_headers=("Authorization", "Content-Type"),
+    max_age=86400,
 )
 
+
+@app.exception_handler(ConnectionFailure)
+async def database_unavailable(request, exc):
+    # Raised when the pool wait queue or server selection times out.
+    return MongoJSONResponse(status_code=503, content={"detail": "Database unavailable"})
+
+
 # ----------------------
 # Utility functions
 # ----------------------
 
-def _hash_password(password: str, salt: str) -> str:
+# Argon2id encodes its own salt and parameters into the hash string.
+_ph = PasswordHasher(time_cost=3, memory_cost=65536, parallelism=1)
+
+
+def _hash_password(password: str) -> str:
+    return _ph.hash(password)
+
+
+def _legacy_hash_password(password: str, salt: str) -> str:
+    # SHA-256(salt + password), kept only to verify rows created before Argon2.
     return hashlib.sha256((salt + password).encode()).hexdigest()
 
 
-def _get_user_by_email(email: str) -> Optional[dict]:
-    return db["user"].find_one({"email": email}) if db else None
+def _verify_password(stored: str, password: str, salt: Optional[str] = None) -> bool:
+    if salt is not None:
+        expected = _legacy_hash_password(password, salt)
+        return hmac.compare_digest(expected.encode(), stored.encode())
+    try:
+        return _ph.verify(stored, password)
+    except (VerificationError, InvalidHashError):
+        return False
+
+
+def _password_needs_rehash(stored: str, salt: Optional[str] = None) -> bool:
+    return salt is not None or _ph.check_needs_rehash(stored)
+
+
+# Argon2 is CPU-bound, so it runs in worker processes rather than the event
+# loop or the default threadpool. Forking this process directly is unsafe once
+# Motor's monitor threads are running, so workers come from a forkserver (or
+# spawn); they import this module to resolve the functions above, which loads
+# argon2 once per worker.
+_HASH_MP_CONTEXT = multiprocessing.get_context(
+    "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+)
+
+
+# Every web worker owns a hash pool; by default the pools split the cores
+# between them so WEB_CONCURRENCY x HASH_POOL_WORKERS stays near the CPU count
+# (each Argon2 call holds 64 MiB). Gunicorn also reads WEB_CONCURRENCY.
+_CPU_COUNT = os.cpu_count() or 1
+WEB_CONCURRENCY = int(os.getenv("WEB_CONCURRENCY", _CPU_COUNT))
+HASH_POOL_WORKERS = int(os.getenv("HASH_POOL_WORKERS", max(1, _CPU_COUNT // max(1, WEB_CONCURRENCY))))
+
+
+def _new_hash_pool() -> ProcessPoolExecutor:
+    return ProcessPoolExecutor(max_workers=HASH_POOL_WORKERS, mp_context=_HASH_MP_CONTEXT)
+
 
+_HASH_POOL = _new_hash_pool()
 
-def _get_user_by_token(token: str) -> Optional[dict]:
-    if not token:
+
+async def _run_in_hash_pool(fn, *args):
+    global _HASH_POOL
+    pool = _HASH_POOL
+    try:
+        return await asyncio.get_running_loop().run_in_executor(pool, fn, *args)
+    except BrokenProcessPool:
+        # A worker died (e.g. OOM-killed), which poisons the whole executor.
+        # Replace it once, unless a concurrent caller already did, and retry.
+        logger.warning("Hash worker pool broke; starting a new one")
+        if _HASH_POOL is pool:
+            _HASH_POOL = _new_hash_pool()
+            pool.shutdown(wait=False, cancel_futures=True)
+        return await asyncio.get_running_loop().run_in_executor(_HASH_POOL, fn, *args)
+
+
+def _hash_token(token: str) -> Binary:
+    # Tokens are stored hashed so a DB leak does not expose usable credentials
+    # and the lookup never compares raw secrets. The raw 32-byte digest keeps
+    # index keys half the size of a hex string.
+    return Binary(hashlib.sha256(token.encode()).digest())
+
+
+# Only the fields each caller reads.
+_USER_LOGIN_FIELDS = {"_id": 1, "name": 1, "email": 1, "salt": 1, "password_hash": 1}
+_USER_PUBLIC_FIELDS = {"_id": 1, "name": 1, "email": 1}
+_TRIP_SUMMARY_FIELDS = {"_id": 1, "title": 1, "destination": 1, "days": 1, "created_at": 1}
+
+
+_SESSION_TTL = timedelta(days=30)
+
+
+async def _get_user_by_email(email: str) -> Optional[dict]:
+    return await db["user"].find_one({"email": email}, _USER_LOGIN_FIELDS) if db is not None else None
+
+
+# Token hash -> (user document, session expiry), so repeat requests skip the
+# Mongo round trip. Hits past the session's expires_at are rejected.
+# Drop entries with _tok_cache.pop(token_hash, None) when a token is revoked.
+_tok_cache: TTLCache = TTLCache(maxsize=10_000, ttl=300)
+
+
+async def _create_session(user_id: ObjectId, now: datetime) -> str:
+    # 192 bits of entropy in 32 URL-safe characters.
+    token = secrets.token_urlsafe(24)
+    await db["session"].insert_one({
+        "token_hash": _hash_token(token),
+        "user_id": user_id,
+        "created_at": now,
+        "expires_at": now + _SESSION_TTL,
+    })
+    return token
+
+
+async def _get_user_by_token(token: str) -> Optional[dict]:
+    if not token or db is None:
         return None
-    return db["user"].find_one({"tokens": token}) if db else None
+    token_hash = _hash_token(token)
+    now = datetime.now(timezone.utc)
+    cached = _tok_cache.get(token_hash)
+    if cached is not None:
+        user, expires_at = cached
+        if expires_at > now:
+            return user
+        _tok_cache.pop(token_hash, None)
+        return None
+    # The TTL monitor only sweeps once a minute, so check expiry explicitly.
+    session = await db["session"].find_one(
+        {"token_hash": token_hash, "expires_at": {"$gt": now}},
+        {"user_id": 1, "expires_at": 1},
+    )
+    if session is None:
+        return None
+    user = await db["user"].find_one({"_id": session["user_id"]}, _USER_PUBLIC_FIELDS)
+    if user is not None:
+        _tok_cache[token_hash] = (user, session["expires_at"])
+    return user
+
+
+def bearer_token(authorization: Optional[str] = Header(default=None)) -> str:
+    # Checked first so an unconfigured database reports 500 rather than 401.
+    if db is None:
+        raise HTTPException(status_code=500, detail="Database not configured")
+    if not authorization or not authorization.startswith("Bearer "):
+        raise HTTPException(status_code=401, detail="Unauthorized")
+    return authorization[7:].strip()
 
 
 # ----------------------
@@ -43,41 +210,120 @@ def _get_user_by_token(token: str) -> Optional[dict]:
 # ----------------------
 
 class RegisterRequest(BaseModel):
+    model_config = ConfigDict(extra="ignore")
+
     name: str
     email: EmailStr
     password: str
 
 
 class LoginRequest(BaseModel):
+    model_config = ConfigDict(extra="ignore")
+
     email: EmailStr
     password: str
 
 
 class AuthResponse(BaseModel):
+    model_config = ConfigDict(extra="ignore")
+
     token: str
     name: str
     email: EmailStr
 
 
+# Built once; AuthResponse payloads are dumped through it instead of letting
+# FastAPI revalidate the model on every login/register.
+_AUTH_ADAPTER = TypeAdapter(AuthResponse)
+
+
+def _auth_response(token: str, name: str, email: str) -> MongoJSONResponse:
+    # Fields come from validated requests or stored users, so skip revalidation.
+    return MongoJSONResponse(_AUTH_ADAPTER.dump_python(AuthResponse.model_construct(token=token, name=name, email=email)))
+
+
 class TripCreateRequest(BaseModel):
+    model_config = ConfigDict(extra="ignore")
+
     prompt: str = Field(..., description="Natural language description of the desired trip")
     days: int = Field(3, ge=1, le=30)
-    destination: Optional[str] = None
-    budget: Optional[str] = Field(None, description="shoestring | standard | luxury")
+    destination: Optional[str] = Field(None, max_length=100)
+    budget: Optional[str] = Field(None, max_length=100, description="shoestring | standard | luxury")
     title: Optional[str] = None
 
 
+class TripBulkRequest(BaseModel):
+    model_config = ConfigDict(extra="ignore")
+
+    trips: List[TripCreateRequest] = Field(..., min_length=1, max_length=100)
+
+
+# ----------------------
+# Startup
+# ----------------------
+
+# Indexes from earlier schemas that nothing queries any more; dropped on
+# startup so writes stop maintaining them. user.tokens was replaced by the
+# session collection; the stale arrays can be removed once with
+# db.user.updateMany({tokens: {$exists: true}}, {$unset: {tokens: ""}}).
+# list_trips paginates on _id, so the created_at trip index is unused.
+_LEGACY_INDEXES = [
+    ("user", "tokens_1"),
+    ("trip", "user_id_1_created_at_-1"),
+]
+
+# Server error code for dropIndex on an index that does not exist.
+_INDEX_NOT_FOUND = 27
+
+
+@app.on_event("startup")
+async def ensure_indexes():
+    if db is None:
+        return
+    indexes = [
+        ("user", "email", {"unique": True}),
+        ("session", "token_hash", {"unique": True}),
+        ("session", "expires_at", {"expireAfterSeconds": 0}),
+        # Serves list_trips' filter, _id cursor and sort from the index without an in-memory SORT stage.
+        ("trip", [("user_id", 1), ("_id", -1)], {}),
+    ]
+    # An unreachable database or pre-existing duplicate emails must not stop
+    # the app from booting; /test and the 503 handler report the problem.
+    for collection, keys, options in indexes:
+        try:
+            await db[collection].create_index(keys, **options)
+        except ConnectionFailure:
+            # Each further attempt would only wait out serverSelectionTimeoutMS again.
+            logger.exception("Database unreachable; skipping index creation")
+            return
+        except PyMongoError:
+            logger.exception("Could not create index %r on %s", keys, collection)
+
+    for collection, name in _LEGACY_INDEXES:
+        try:
+            await db[collection].drop_index(name)
+        except PyMongoError as exc:
+            if isinstance(exc, OperationFailure) and exc.code == _INDEX_NOT_FOUND:
+                continue  # Already dropped, or never created on this database.
+            logger.exception("Could not drop legacy index %s on %s", name, collection)
+
+
+@app.on_event("shutdown")
+def shutdown_hash_pool():
+    _HASH_POOL.shutdown(wait=False, cancel_futures=True)
+
+
 # ----------------------
 # Routes
 # ----------------------
 
 @app.get("/")
-def root():
+async def root():
     return {"message": "Travel Planner Backend is running"}
 
 
 @app.get("/test")
-def test_database():
+async def test_database(full: bool = False):
     response = {
         "backend": "✅ Running",
         "database": "❌ Not Available",
@@ -88,9 +334,13 @@ def test_database():
     }
     try:
         if db is not None:
+            # A ping is a single admin command; listing collections is a
+            # metadata query, so it is only done on request (?full=1).
+            await db.command("ping")
             response["database"] = "✅ Available"
             response["connection_status"] = "Connected"
-            response["collections"] = db.list_collection_names()[:10]
+            if full:
+                response["collections"] = (await db.list_collection_names())[:10]
         else:
             response["database"] = "❌ Not Available"
     except Exception as e:
@@ -101,51 +351,57 @@ def test_database():
 # ---- Auth ----
 
 @app.post("/api/auth/register", response_model=AuthResponse)
-def register(req: RegisterRequest):
+async def register(req: RegisterRequest):
     if db is None:
         raise HTTPException(status_code=500, detail="Database not configured")
-    existing = _get_user_by_email(req.email)
+    existing = await _get_user_by_email(req.email)
     if existing:
         raise HTTPException(status_code=400, detail="Email already registered")
 
-    salt = secrets.token_hex(16)
-    password_hash = _hash_password(req.password, salt)
-    token = secrets.token_hex(24)
+    password_hash = await _run_in_hash_pool(_hash_password, req.password)
 
+    now = datetime.now(timezone.utc)
     user_doc = {
         "name": req.name,
         "email": str(req.email),
         "password_hash": password_hash,
-        "salt": salt,
-        "tokens": [token],
-        "created_at": datetime.now(timezone.utc),
-        "updated_at": datetime.now(timezone.utc),
+        "created_at": now,
+        "updated_at": now,
     }
-    db["user"].insert_one(user_doc)
-    return AuthResponse(token=token, name=req.name, email=req.email)
+    try:
+        user_id = (await db["user"].insert_one(user_doc)).inserted_id
+    except DuplicateKeyError:
+        # Lost a race with a concurrent registration for the same email.
+        raise HTTPException(status_code=400, detail="Email already registered")
+    token = await _create_session(user_id, now)
+    return _auth_response(token, req.name, str(req.email))
 
 
 @app.post("/api/auth/login", response_model=AuthResponse)
-def login(req: LoginRequest):
+async def login(req: LoginRequest):
     if db is None:
         raise HTTPException(status_code=500, detail="Database not configured")
-    user = _get_user_by_email(req.email)
+    user = await _get_user_by_email(req.email)
     if not user:
         raise HTTPException(status_code=401, detail="Invalid credentials")
-    expected = _hash_password(req.password, user.get("salt", ""))
-    if expected != user.get("password_hash"):
+    stored = user.get("password_hash") or ""
+    salt = user.get("salt")
+    if not await _run_in_hash_pool(_verify_password, stored, req.password, salt):
         raise HTTPException(status_code=401, detail="Invalid credentials")
-    token = secrets.token_hex(24)
-    db["user"].update_one({"_id": user["_id"]}, {"$push": {"tokens": token}, "$set": {"updated_at": datetime.now(timezone.utc)}})
-    return AuthResponse(token=token, name=user.get("name", ""), email=user.get("email", ""))
+    now = datetime.now(timezone.utc)
+    token = await _create_session(user["_id"], now)
+    update: Dict[str, Any] = {"$set": {"updated_at": now}}
+    if _password_needs_rehash(stored, salt):
+        # Lazily upgrade legacy SHA-256 rows and outdated Argon2 parameters.
+        update["$set"]["password_hash"] = await _run_in_hash_pool(_hash_password, req.password)
+        update["$unset"] = {"salt": ""}
+    await db["user"].update_one({"_id": user["_id"]}, update)
+    return _auth_response(token, user.get("name", ""), user.get("email", ""))
 
 
 @app.get("/api/me")
-def me(authorization: Optional[str] = Header(default=None)):
-    if db is None:
-        raise HTTPException(status_code=500, detail="Database not configured")
-    token = (authorization or "").replace("Bearer ", "").strip()
-    user = _get_user_by_token(token)
+async def me(token: str = Depends(bearer_token)):
+    user = await _get_user_by_token(token)
     if not user:
         raise HTTPException(status_code=401, detail="Unauthorized")
     return {"name": user.get("name"), "email": user.get("email")}
@@ -154,70 +410,134 @@ def me(authorization: Optional[str] = Header(default=None)):
 # ---- Trips ----
 
 
-def _generate_itinerary(prompt: str, days: int, destination: Optional[str], budget: Optional[str]) -> List[Dict[str, Any]]:
-    budget_hint = {
-        "shoestring": ["street food", "free walking tours", "public transit"],
-        "standard": ["local bistros", "top sights", "rideshare"],
-        "luxury": ["fine dining", "private tours", "chauffeur"],
-    }
-    hints = budget_hint.get((budget or "standard").lower(), budget_hint["standard"])
-    itinerary = []
-    for d in range(1, days + 1):
-        day_plan = {
+_BUDGET_HINT: Mapping[str, Tuple[str, str, str]] = MappingProxyType({
+    "shoestring": ("street food", "free walking tours", "public transit"),
+    "standard": ("local bistros", "top sights", "rideshare"),
+    "luxury": ("fine dining", "private tours", "chauffeur"),
+})
+
+
+_THEME = "Day {d} • {theme}"
+_MORNING = "Start with {h0} near the main square. Stroll through a scenic district inspired by: {p}"
+_AFTERNOON = "Visit two must‑see spots. Consider a museum or viewpoint. Use {h1}."
+_EVENING = "Dinner with a view, then a relaxing walk. End with {h2} back to stay."
+
+
+@functools.lru_cache(maxsize=1024)
+def _itinerary_cached(prompt_prefix: str, days: int, destination: Optional[str], budget_key: str) -> Tuple[Mapping[str, Any], ...]:
+    hints = _BUDGET_HINT[budget_key]
+    fields = {"theme": destination or "Explorer", "h0": hints[0], "h1": hints[1], "h2": hints[2], "p": prompt_prefix}
+    # Only the theme varies by day, so the other slots are formatted once.
+    morning = _MORNING.format_map(fields)
+    afternoon = _AFTERNOON.format_map(fields)
+    evening = _EVENING.format_map(fields)
+    # Read-only views so a shared cache entry cannot be mutated by a caller.
+    return tuple(
+        MappingProxyType({
             "day": d,
-            "theme": f"Day {d} • {destination or 'Explorer'}",
-            "morning": f"Start with {hints[0]} near the main square. Stroll through a scenic district inspired by: {prompt[:80]}",
-            "afternoon": f"Visit two must‑see spots. Consider a museum or viewpoint. Use {hints[1]}.",
-            "evening": f"Dinner with a view, then a relaxing walk. End with {hints[2]} back to stay.",
-        }
-        itinerary.append(day_plan)
-    return itinerary
+            "theme": _THEME.format(d=d, theme=fields["theme"]),
+            "morning": morning,
+            "afternoon": afternoon,
+            "evening": evening,
+        })
+        for d in range(1, days + 1)
+    )
 
 
-@app.post("/api/trips")
-def create_trip(req: TripCreateRequest, authorization: Optional[str] = Header(default=None)):
-    if db is None:
-        raise HTTPException(status_code=500, detail="Database not configured")
-    token = (authorization or "").replace("Bearer ", "").strip()
-    user = _get_user_by_token(token)
-    if not user:
-        raise HTTPException(status_code=401, detail="Unauthorized")
+def _generate_itinerary(prompt: str, days: int, destination: Optional[str], budget: Optional[str]) -> List[Dict[str, Any]]:
+    # Only the first 80 characters of the prompt and the resolved budget tier
+    # affect the output, so the cache key is normalised to just those.
+    budget_key = (budget or "standard").lower()
+    if budget_key not in _BUDGET_HINT:
+        budget_key = "standard"
+    return [dict(day) for day in _itinerary_cached(prompt[:80], days, destination, budget_key)]
+
 
+def _build_trip_doc(req: TripCreateRequest, user_id: str, now: datetime) -> Dict[str, Any]:
     itinerary = _generate_itinerary(req.prompt, req.days, req.destination, req.budget)
     title = req.title or (req.destination or "Custom Trip") + f" • {req.days} days"
-
-    trip_doc = {
-        "user_id": str(user["_id"]),
+    return {
+        "user_id": user_id,
         "title": title,
         "prompt": req.prompt,
         "days": req.days,
         "itinerary": itinerary,
         "destination": req.destination,
         "budget": req.budget,
-        "created_at": datetime.now(timezone.utc),
-        "updated_at": datetime.now(timezone.utc),
+        "created_at": now,
+        "updated_at": now,
     }
-    inserted_id = db["trip"].insert_one(trip_doc).inserted_id
-    trip_doc["_id"] = str(inserted_id)
-    return trip_doc
+
+
+@app.post("/api/trips")
+async def create_trip(req: TripCreateRequest, token: str = Depends(bearer_token)):
+    user = await _get_user_by_token(token)
+    if not user:
+        raise HTTPException(status_code=401, detail="Unauthorized")
+
+    trip_doc = _build_trip_doc(req, str(user["_id"]), datetime.now(timezone.utc))
+    # insert_one stores the new ObjectId on trip_doc["_id"]. Returning the
+    # response directly skips jsonable_encoder, which cannot encode ObjectId.
+    await db["trip"].insert_one(trip_doc)
+    return MongoJSONResponse(trip_doc)
+
+
+@app.post("/api/trips/bulk")
+async def create_trips_bulk(req: TripBulkRequest, token: str = Depends(bearer_token)):
+    user = await _get_user_by_token(token)
+    if not user:
+        raise HTTPException(status_code=401, detail="Unauthorized")
+
+    user_id = str(user["_id"])
+    now = datetime.now(timezone.utc)
+    docs = [_build_trip_doc(t, user_id, now) for t in req.trips]
+    # One round trip for the whole batch; unordered lets the server apply writes in parallel.
+    result = await db["trip"].insert_many(docs, ordered=False)
+    return {"inserted_ids": [str(i) for i in result.inserted_ids]}
 
 
 @app.get("/api/trips")
-def list_trips(authorization: Optional[str] = Header(default=None)):
-    if db is None:
-        raise HTTPException(status_code=500, detail="Database not configured")
-    token = (authorization or "").replace("Bearer ", "").strip()
-    user = _get_user_by_token(token)
+async def list_trips(
+    limit: int = Query(20, ge=1, le=100),
+    cursor_id: Optional[str] = Query(None, description="_id of the last trip on the previous page"),
+    token: str = Depends(bearer_token),
+):
+    user = await _get_user_by_token(token)
+    if not user:
+        raise HTTPException(status_code=401, detail="Unauthorized")
+    query: Dict[str, Any] = {"user_id": str(user["_id"])}
+    if cursor_id is not None:
+        if not ObjectId.is_valid(cursor_id):
+            raise HTTPException(status_code=400, detail="Invalid cursor_id")
+        query["_id"] = {"$lt": ObjectId(cursor_id)}
+    # ObjectIds grow with insertion time, so _id order is newest first.
+    trips = await db["trip"].find(query, _TRIP_SUMMARY_FIELDS).sort("_id", -1).limit(limit).to_list(length=limit)
+    return MongoJSONResponse(trips)
+
+
+@app.get("/api/trips/{trip_id}")
+async def get_trip(trip_id: str, token: str = Depends(bearer_token)):
+    user = await _get_user_by_token(token)
     if not user:
         raise HTTPException(status_code=401, detail="Unauthorized")
-    trips = list(db["trip"].find({"user_id": str(user["_id"]) }).sort("created_at", -1))
-    # Convert ObjectId to string
-    for t in trips:
-        t["_id"] = str(t["_id"])
-    return trips
+    if not ObjectId.is_valid(trip_id):
+        raise HTTPException(status_code=404, detail="Trip not found")
+    trip = await db["trip"].find_one({"_id": ObjectId(trip_id), "user_id": str(user["_id"])})
+    if not trip:
+        raise HTTPException(status_code=404, detail="Trip not found")
+    return MongoJSONResponse(trip)
 
 
 if __name__ == "__main__":
     import uvicorn
     port = int(os.getenv("PORT", 8000))
-    uvicorn.run(app, host="0.0.0.0", port=port)
+    # Each worker imports this module itself, so every process gets its own
+    # Mongo client; Motor only connects on first use.
+    uvicorn.run(
+        "main:app",
+        host="0.0.0.0",
+        port=port,
+        loop="uvloop",
+        http="httptools",
+        workers=WEB_CONCURRENCY,
+    )
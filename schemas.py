@@ -12,6 +12,7 @@ Model name is converted to lowercase for the collection name:
 """
 
 from pydantic import BaseModel, Field, EmailStr
+from datetime import datetime
 from typing import Optional, List, Dict, Any
 
 class User(BaseModel):
@@ -21,9 +22,18 @@ class User(BaseModel):
     """
     name: str = Field(..., description="Full name")
     email: EmailStr = Field(..., description="Email address")
-    password_hash: str = Field(..., description="Hashed password")
-    salt: str = Field(..., description="Per-user salt")
-    tokens: List[str] = Field(default_factory=list, description="Active auth tokens")
+    password_hash: str = Field(..., description="Argon2id password hash")
+    salt: Optional[str] = Field(None, description="Per-user salt (legacy SHA-256 rows only)")
+
+class Session(BaseModel):
+    """
+    Auth sessions, one per issued token. Collection name: "session"
+    Expired rows are removed by a TTL index on expires_at.
+    """
+    token_hash: bytes = Field(..., description="SHA-256 digest of the auth token")
+    user_id: Any = Field(..., description="ObjectId of the owning user")
+    created_at: datetime = Field(..., description="When the token was issued")
+    expires_at: datetime = Field(..., description="When the token stops being valid")
 
 class Trip(BaseModel):
     """